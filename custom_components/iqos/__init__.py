@@ -7,7 +7,8 @@ from bleak_retry_connector import (
     close_stale_connections_by_address,
     get_device,
 )
-from .api import IQOSBLE
+from bleak.backends.scanner import AdvertisementData
+from .api import DEFAULT_ATTEMPTS, IQOSBLE
 
 from homeassistant.components import bluetooth
 from homeassistant.components.bluetooth.match import ADDRESS, BluetoothCallbackMatcher
@@ -16,9 +17,18 @@ from homeassistant.const import CONF_ADDRESS, EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 
-from .const import DOMAIN
+from .const import (
+    CONF_REPLACE_SENSOR_STATISTICS,
+    CONF_LONG_TERM_STATISTICS,
+    CONNECTION_MODE_LAZY,
+    DEFAULT_REPLACE_SENSOR_STATISTICS,
+    DEFAULT_LONG_TERM_STATISTICS,
+    DOMAIN,
+)
 from .coordinator import IQOSBLECoordinator
-from .models import IQOSBLEData
+from .hub import async_get_update_hub
+from .models import IQOSBLEData, IQOSTuning
+from .statistics import IQOSStatistics, async_get_statistics_hub
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
 
@@ -38,8 +48,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         raise ConfigEntryNotReady(f"Could not find IQOS device with address {address}")
 
     iqos_ble = IQOSBLE(ble_device)
+    iqos_ble.set_scanner_advertisements(
+        _async_scanner_advertisements(hass, address.upper())
+    )
 
-    coordinator = IQOSBLECoordinator(hass, iqos_ble)
+    coordinator = IQOSBLECoordinator(hass, iqos_ble, async_get_update_hub(hass))
 
     try:
         await iqos_ble.initialise()
@@ -48,6 +61,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             f"Could not initialise IQOS device with address {address}"
         ) from exc
 
+    statistics: IQOSStatistics | None = None
+    if "recorder" in hass.config.components and entry.options.get(
+        CONF_LONG_TERM_STATISTICS, DEFAULT_LONG_TERM_STATISTICS
+    ):
+        statistics = IQOSStatistics(
+            hass, iqos_ble, entry.title, async_get_statistics_hub(hass)
+        )
+        entry.async_on_unload(statistics.async_start())
+
     @callback
     def _async_update_ble(
         service_info: bluetooth.BluetoothServiceInfoBleak,
@@ -57,6 +79,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         iqos_ble.set_ble_device_and_advertisement_data(
             service_info.device, service_info.advertisement
         )
+        iqos_ble.set_scanner_advertisements(
+            _async_scanner_advertisements(hass, service_info.address)
+        )
 
     entry.async_on_unload(
         bluetooth.async_register_callback(
@@ -67,9 +92,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     )
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = IQOSBLEData(
-        entry.title, iqos_ble, coordinator
+    data = hass.data.setdefault(DOMAIN, {})[entry.entry_id] = IQOSBLEData(
+        entry.title, iqos_ble, coordinator, dict(entry.options), statistics
     )
+    _async_apply_tuning(entry, data)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
@@ -84,11 +110,45 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+@callback
+def _async_scanner_advertisements(
+    hass: HomeAssistant, address: str
+) -> dict[str, AdvertisementData]:
+    """Return the last advertisement of a holder seen by each scanner."""
+    return {
+        scanner_device.scanner.source: scanner_device.advertisement
+        for scanner_device in bluetooth.async_scanner_devices_by_address(
+            hass, address, True
+        )
+    }
+
+
+@callback
+def _async_apply_tuning(entry: ConfigEntry, data: IQOSBLEData) -> None:
+    """Apply the tuning options to the running device and coordinator."""
+    tuning = IQOSTuning.from_options(entry.options)
+    data.device.set_connection_options(
+        max_attempts=tuning.retry_attempts or DEFAULT_ATTEMPTS,
+        lazy_connect=tuning.connection_mode == CONNECTION_MODE_LAZY,
+        rssi_history=tuning.rssi_history,
+    )
+    data.coordinator.debounce_seconds = tuning.debounce_seconds
+    data.options = dict(entry.options)
+
+
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     data: IQOSBLEData = hass.data[DOMAIN][entry.entry_id]
-    if entry.title != data.title:
+    if entry.title != data.title or any(
+        entry.options.get(key, default) != data.options.get(key, default)
+        for key, default in (
+            (CONF_LONG_TERM_STATISTICS, DEFAULT_LONG_TERM_STATISTICS),
+            (CONF_REPLACE_SENSOR_STATISTICS, DEFAULT_REPLACE_SENSOR_STATISTICS),
+        )
+    ):
         await hass.config_entries.async_reload(entry.entry_id)
+        return
+    _async_apply_tuning(entry, data)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -96,5 +156,6 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         data: IQOSBLEData = hass.data[DOMAIN].pop(entry.entry_id)
         await data.device.stop()
+        await data.coordinator.async_shutdown()
 
     return unload_ok
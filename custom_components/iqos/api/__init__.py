@@ -5,12 +5,18 @@ __version__ = "0.2.0"
 
 from bleak_retry_connector import get_device
 
-from .exceptions import CharacteristicMissingError
-from .iqos_ble import BLEAK_EXCEPTIONS, IQOSBLE, IQOSBLEState
+from .exceptions import CharacteristicMissingError, FirmwareUploadError
+from .firmware import FirmwareUploader
+from .iqos_ble import BLEAK_EXCEPTIONS, DEFAULT_ATTEMPTS, IQOSBLE, IQOSBLEState
+from .models import FirmwareUploadProgress
 
 __all__ = [
     "BLEAK_EXCEPTIONS",
     "CharacteristicMissingError",
+    "DEFAULT_ATTEMPTS",
+    "FirmwareUploadError",
+    "FirmwareUploadProgress",
+    "FirmwareUploader",
     "IQOSBLE",
     "IQOSBLEState",
     "get_device",
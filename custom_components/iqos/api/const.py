@@ -12,6 +12,21 @@
 # }
 
 CHARACTERISTIC_NOTIFY = "f8a54120-b041-11e4-9be7-0002a5d5c51b"
+CHARACTERISTIC_FW_UPGRADE_CONTROL = "fe272aa0-b041-11e4-87cb-0002a5d5c51b"
+CHARACTERISTIC_FW_UPGRADE_STATUS = "15c32c40-b042-11e4-a643-0002a5d5c51b"
+
+# Firmware packets are <flags:u8><offset:u32le><payload>, the status
+# characteristic answers with <code:u8><tag:u8><confirmed offset:u32le>.
+# The upper seven bits of the flags tag the window a packet belongs to and
+# the status echoes the tag of the packet it answers.
+FW_PACKET_HEADER_SIZE = 5
+FW_STATUS_SIZE = 6
+FW_FLAG_ACK_REQUEST = 0x01
+FW_WINDOW_TAG_SHIFT = 1
+FW_WINDOW_TAG_MASK = 0x7F
+FW_STATUS_OK = 0x00
+FW_STATUS_REJECTED = 0x01
+ATT_HEADER_SIZE = 3
 
 frame_start = b"(\x07|\x0f)\x00"
 frame_case_battery = b"(?P<case_battery>.)"
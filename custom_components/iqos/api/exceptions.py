@@ -1,2 +1,6 @@
 class CharacteristicMissingError(Exception):
     """Raised when a characteristic is missing."""
+
+
+class FirmwareUploadError(Exception):
+    """Raised when a firmware upload cannot make progress."""
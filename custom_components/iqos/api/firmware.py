@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from collections.abc import Awaitable, Callable
+from typing import BinaryIO
+
+from .const import (
+    FW_FLAG_ACK_REQUEST,
+    FW_PACKET_HEADER_SIZE,
+    FW_STATUS_OK,
+    FW_STATUS_REJECTED,
+    FW_STATUS_SIZE,
+    FW_WINDOW_TAG_MASK,
+    FW_WINDOW_TAG_SHIFT,
+)
+from .exceptions import FirmwareUploadError
+from .models import FirmwareUploadProgress
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 8
+DEFAULT_ACK_TIMEOUT = 5.0
+DEFAULT_MAX_REJECTIONS = 5
+WINDOW_REGROW_AFTER = 8
+
+_PACKET_HEADER = struct.Struct("<BI")
+_STATUS = struct.Struct("<BBI")
+
+
+def build_firmware_packet(
+    offset: int, payload: bytes, ack_request: bool, tag: int = 0
+) -> bytes:
+    """Build a packet for the firmware upgrade control characteristic."""
+    flags = (tag & FW_WINDOW_TAG_MASK) << FW_WINDOW_TAG_SHIFT
+    if ack_request:
+        flags |= FW_FLAG_ACK_REQUEST
+    return _PACKET_HEADER.pack(flags, offset) + payload
+
+
+def parse_firmware_packet(data: bytes) -> tuple[bool, int, int, bytes]:
+    """Split a firmware packet into ack request flag, tag, offset and payload."""
+    flags, offset = _PACKET_HEADER.unpack_from(data)
+    return (
+        bool(flags & FW_FLAG_ACK_REQUEST),
+        flags >> FW_WINDOW_TAG_SHIFT,
+        offset,
+        data[FW_PACKET_HEADER_SIZE:],
+    )
+
+
+def build_firmware_status(code: int, tag: int, offset: int) -> bytes:
+    """Build a firmware upgrade status frame."""
+    return _STATUS.pack(code, tag, offset)
+
+
+def parse_firmware_status(data: bytes) -> tuple[int, int, int]:
+    """Split a firmware upgrade status frame into code, tag and offset."""
+    if len(data) < FW_STATUS_SIZE:
+        raise FirmwareUploadError(f"Malformed firmware status: {data.hex()}")
+    return _STATUS.unpack_from(data)
+
+
+def _read_block(file: BinaryIO, offset: int, size: int) -> bytes:
+    """Read a block of the image, runs in the executor."""
+    file.seek(offset)
+    return file.read(size)
+
+
+class FirmwareUploader:
+    """Stream a firmware image in windows of write-without-response packets.
+
+    Only one window of the image is held in memory at a time. The last packet
+    of every window asks the device for an acknowledgement through the status
+    characteristic, and the next window is only sent once the device confirmed
+    the previous one. A rejected window is resent from the offset the device
+    reports, with half the window, and the upload fails once the device
+    rejected the same offset ``max_rejections`` times in a row. The window
+    doubles again, up to its initial size, after ``WINDOW_REGROW_AFTER``
+    windows in a row were confirmed. Packets carry a tag of their window and
+    a rejection answering an earlier window is ignored, as that window was
+    already resent. The confirmed offset survives failed attempts so a new
+    call to ``upload`` resumes where the device left off.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        write: Callable[[bytes], Awaitable[None]],
+        chunk_size: int,
+        window: int = DEFAULT_WINDOW,
+        ack_timeout: float = DEFAULT_ACK_TIMEOUT,
+        max_rejections: int = DEFAULT_MAX_REJECTIONS,
+        progress_callback: Callable[[FirmwareUploadProgress], None] | None = None,
+    ) -> None:
+        """Init the FirmwareUploader."""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if window < 1:
+            raise ValueError("window must be positive")
+        self._path = path
+        self._write = write
+        self._chunk_size = chunk_size
+        self._window = window
+        self._max_window = window
+        self._ack_timeout = ack_timeout
+        self._max_rejections = max_rejections
+        self._progress_callback = progress_callback
+        self._total = 0
+        self._confirmed = 0
+        self._rejected_at: int | None = None
+        self._last_rejected_at: int | None = None
+        self._rejections = 0
+        self._confirmed_windows = 0
+        self._tag = 0
+        self._interrupted = False
+        self._status_event = asyncio.Event()
+        self._session_offset = 0
+        self._session_start = 0.0
+
+    @property
+    def confirmed_offset(self) -> int:
+        """Return the last offset acknowledged by the device."""
+        return self._confirmed
+
+    @property
+    def chunk_size(self) -> int:
+        """Return the payload size of a packet."""
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, chunk_size: int) -> None:
+        """Set the payload size of a packet, e.g. for the MTU of a new link."""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self._chunk_size = chunk_size
+
+    @property
+    def done(self) -> bool:
+        """Return whether the whole image was acknowledged."""
+        return bool(self._total) and self._confirmed >= self._total
+
+    @property
+    def progress(self) -> FirmwareUploadProgress:
+        """Return the current progress with throughput and ETA."""
+        elapsed = time.monotonic() - self._session_start if self._session_start else 0.0
+        sent = self._confirmed - self._session_offset
+        bytes_per_second = sent / elapsed if elapsed > 0 else 0.0
+        eta = (
+            (self._total - self._confirmed) / bytes_per_second
+            if bytes_per_second > 0
+            else None
+        )
+        return FirmwareUploadProgress(
+            offset=self._confirmed,
+            total=self._total,
+            elapsed=elapsed,
+            bytes_per_second=bytes_per_second,
+            eta=eta,
+        )
+
+    def handle_status(self, _sender: int, data: bytearray) -> None:
+        """Handle a notification from the firmware upgrade status characteristic."""
+        code, tag, offset = parse_firmware_status(bytes(data))
+        if code == FW_STATUS_OK:
+            self._confirmed = max(self._confirmed, offset)
+        elif code == FW_STATUS_REJECTED:
+            if tag != self._tag:
+                _LOGGER.debug("Ignoring rejection of an earlier window at %s", offset)
+                return
+            _LOGGER.debug("Firmware window rejected, rewinding to %s", offset)
+            self._rejected_at = offset
+        else:
+            _LOGGER.warning("Unknown firmware status %s at offset %s", code, offset)
+            return
+        self._status_event.set()
+
+    def handle_disconnect(self) -> None:
+        """Abort the window in flight, the next upload resumes from the device."""
+        self._interrupted = True
+        self._status_event.set()
+
+    async def upload(self) -> FirmwareUploadProgress:
+        """Upload the image from the last confirmed offset."""
+        loop = asyncio.get_running_loop()
+        self._total = await loop.run_in_executor(None, os.path.getsize, self._path)
+        self._interrupted = False
+        self._session_offset = self._confirmed
+        self._session_start = time.monotonic()
+        file: BinaryIO = await loop.run_in_executor(None, open, self._path, "rb")
+        try:
+            while self._confirmed < self._total:
+                await self._send_window(loop, file)
+                if self._progress_callback is not None:
+                    self._progress_callback(self.progress)
+        finally:
+            await loop.run_in_executor(None, file.close)
+        return self.progress
+
+    async def _send_window(
+        self, loop: asyncio.AbstractEventLoop, file: BinaryIO
+    ) -> None:
+        """Send one window of packets and wait for its acknowledgement."""
+        offset = self._confirmed
+        block = await loop.run_in_executor(
+            None, _read_block, file, offset, self._chunk_size * self._window
+        )
+        if not block:
+            raise FirmwareUploadError(f"Image ended early at offset {offset}")
+        target = offset + len(block)
+        self._tag = (self._tag + 1) & FW_WINDOW_TAG_MASK
+        self._rejected_at = None
+        self._status_event.clear()
+        for start in range(0, len(block), self._chunk_size):
+            payload = block[start : start + self._chunk_size]
+            await self._write(
+                build_firmware_packet(
+                    offset + start,
+                    payload,
+                    start + len(payload) == len(block),
+                    self._tag,
+                )
+            )
+        while self._confirmed < target:
+            if self._interrupted:
+                raise FirmwareUploadError(
+                    f"Disconnected at confirmed offset {self._confirmed}"
+                )
+            if self._rejected_at is not None:
+                self._handle_rejection(self._rejected_at)
+                return
+            try:
+                await asyncio.wait_for(self._status_event.wait(), self._ack_timeout)
+            except asyncio.TimeoutError as exc:
+                raise FirmwareUploadError(
+                    f"No acknowledgement for offset {target} "
+                    f"(confirmed {self._confirmed})"
+                ) from exc
+            self._status_event.clear()
+        self._confirmed_windows += 1
+        if (
+            self._confirmed_windows >= WINDOW_REGROW_AFTER
+            and self._window < self._max_window
+        ):
+            self._window = min(self._window * 2, self._max_window)
+            self._confirmed_windows = 0
+            _LOGGER.debug("Firmware window grown to %s packets", self._window)
+
+    def _handle_rejection(self, offset: int) -> None:
+        """Rewind to a rejected offset with half the window."""
+        if offset == self._last_rejected_at:
+            self._rejections += 1
+        else:
+            self._last_rejected_at = offset
+            self._rejections = 1
+        if self._rejections >= self._max_rejections:
+            raise FirmwareUploadError(
+                f"Device rejected offset {offset} {self._rejections} times"
+            )
+        self._confirmed = offset
+        self._window = max(self._window // 2, 1)
+        self._confirmed_windows = 0
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
+import os
 import re
 import sys
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
 from typing import Any, TypeVar
 
 from bleak.backends.device import BLEDevice
@@ -20,11 +22,17 @@ from bleak_retry_connector import (
 )
 
 from .const import (
+    ATT_HEADER_SIZE,
+    CHARACTERISTIC_FW_UPGRADE_CONTROL,
+    CHARACTERISTIC_FW_UPGRADE_STATUS,
     CHARACTERISTIC_NOTIFY,
+    FW_PACKET_HEADER_SIZE,
     frame_regex,
 )
-from .exceptions import CharacteristicMissingError
-from .models import IQOSBLEState
+from .exceptions import CharacteristicMissingError, FirmwareUploadError
+from .firmware import DEFAULT_WINDOW, FirmwareUploader
+from .models import FirmwareUploadProgress, IQOSBLEState
+from .rssi import RssiTracker
 
 BLEAK_BACKOFF_TIME = 0.25
 
@@ -38,6 +46,7 @@ RETRY_BACKOFF_EXCEPTIONS = (BleakDBusError,)
 _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_ATTEMPTS = sys.maxsize
+FIRMWARE_RESUME_ATTEMPTS = 5
 
 
 class IQOSBLE:
@@ -56,6 +65,33 @@ class IQOSBLE:
         self._callbacks: list[Callable[[IQOSBLEState], None]] = []
         self._disconnected_callbacks: list[Callable[[], None]] = []
         self._buf = b""
+        self._firmware_uploader: FirmwareUploader | None = None
+        self._rssi_tracker = RssiTracker()
+        self._scanner_advertisements: dict[str, AdvertisementData] = {}
+        self._connect_source: str | None = None
+        self._migrate_task: asyncio.Task[None] | None = None
+        self.migrations = 0
+        self._max_attempts = DEFAULT_ATTEMPTS
+        self._lazy_connect = False
+        self._reconnect_pending = False
+        self._stopping = False
+
+    def set_connection_options(
+        self,
+        max_attempts: int = DEFAULT_ATTEMPTS,
+        lazy_connect: bool = False,
+        rssi_history: int | None = None,
+    ) -> None:
+        """Tune reconnects and RSSI smoothing, applies to the running device.
+
+        With ``lazy_connect`` an unexpected disconnect waits for the next
+        advertisement before reconnecting, as does running out of
+        ``max_attempts`` reconnect attempts.
+        """
+        self._max_attempts = max_attempts
+        self._lazy_connect = lazy_connect
+        if rssi_history is not None:
+            self._rssi_tracker.smoothing = 2 / (rssi_history + 1)
 
     def set_ble_device_and_advertisement_data(
         self, ble_device: BLEDevice, advertisement_data: AdvertisementData
@@ -63,6 +99,67 @@ class IQOSBLE:
         """Set the ble device."""
         self._ble_device = ble_device
         self._advertisement_data = advertisement_data
+        if (
+            self._reconnect_pending
+            and not self._stopping
+            and not self.is_connected
+            and not self._connect_lock.locked()
+        ):
+            _LOGGER.debug("%s: Advertisement received, reconnecting", self.name)
+            self._reconnect_pending = False
+            asyncio.create_task(self._reconnect())
+
+    def set_scanner_advertisements(
+        self, advertisements: Mapping[str, AdvertisementData]
+    ) -> None:
+        """Track the RSSI each scanner reports for the device.
+
+        Home Assistant routes a connection through the scanner it prefers,
+        normally the strongest one with a free connection slot. A migration is
+        therefore a reconnect, made once another scanner hears the device
+        clearly better than the one that was strongest when it connected.
+        """
+        for source, advertisement_data in advertisements.items():
+            if self._scanner_advertisements.get(source) is advertisement_data:
+                continue
+            self._scanner_advertisements[source] = advertisement_data
+            self._rssi_tracker.update(source, advertisement_data.rssi)
+        if (
+            self.is_connected
+            and not self._stopping
+            and self._migrate_task is None
+            and not self._connect_lock.locked()
+            and not self._operation_lock.locked()
+            and (target := self._rssi_tracker.migration_target(self._connect_source))
+        ):
+            self._migrate_task = asyncio.create_task(self._migrate(target))
+
+    @property
+    def connect_source(self) -> str | None:
+        """Return the strongest scanner when the device last connected.
+
+        This is the scanner Home Assistant is expected to have connected
+        through, the connection does not report the one it used.
+        """
+        return self._connect_source
+
+    @property
+    def is_connected(self) -> bool:
+        """Return whether the device is connected."""
+        return bool(self._client and self._client.is_connected)
+
+    @property
+    def reconnect_pending(self) -> bool:
+        """Return whether a reconnect waits for the next advertisement."""
+        return self._reconnect_pending
+
+    @property
+    def rssi_by_source(self) -> dict[str, float]:
+        """Return the smoothed RSSI of each scanner."""
+        return {
+            source: tracked.average
+            for source, tracked in self._rssi_tracker.sources.items()
+        }
 
     @property
     def address(self) -> str:
@@ -106,6 +203,12 @@ class IQOSBLE:
     async def stop(self) -> None:
         """Stop the IQOSBLE."""
         _LOGGER.debug("%s: Stop", self.name)
+        self._stopping = True
+        self._reconnect_pending = False
+        if (task := self._migrate_task) is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
         await self._execute_disconnect()
 
     def _fire_callbacks(self) -> None:
@@ -162,6 +265,8 @@ class IQOSBLE:
             # Check again while holding the lock
             if self._client and self._client.is_connected:
                 return
+            if self._stopping:
+                raise BleakError(f"{self.name}: Stopped")
             _LOGGER.debug("%s: Connecting; RSSI: %s", self.name, self.rssi)
             client = await establish_connection(
                 BleakClientWithServiceCache,
@@ -174,19 +279,60 @@ class IQOSBLE:
             _LOGGER.debug("%s: Connected; RSSI: %s", self.name, self.rssi)
 
             self._client = client
+            self._expected_disconnect = False
+            self._reconnect_pending = False
+            self._connect_source = self._rssi_tracker.best_source()
+            self._rssi_tracker.connected()
 
-    async def _reconnect(self) -> None:
+    async def _reconnect(self, attempt: int = 1) -> None:
         """Attempt a reconnect"""
+        if self._stopping:
+            return
         _LOGGER.debug("ensuring connection")
         try:
             await self._ensure_connected()
             _LOGGER.debug("ensured connection - initialising")
             await self.initialise()
         except (BleakNotFoundError, BleakError) as error:
+            if self._stopping:
+                return
+            if attempt >= self._max_attempts:
+                _LOGGER.debug(
+                    "%s: Failed to reconnect after %s attempts, "
+                    "waiting for an advertisement: %s",
+                    self.name,
+                    attempt,
+                    error,
+                )
+                self._reconnect_pending = True
+                return
             _LOGGER.debug("failed to ensure connection - backing off: %s", error)
             await asyncio.sleep(BLEAK_BACKOFF_TIME)
             _LOGGER.debug("reconnecting again")
-            asyncio.create_task(self._reconnect())
+            asyncio.create_task(self._reconnect(attempt + 1))
+
+    async def _migrate(self, source: str) -> None:
+        """Reconnect so the connection can move to a clearly better scanner."""
+        _LOGGER.debug(
+            "%s: Reconnecting to move from %s to %s; RSSI: %s",
+            self.name,
+            self._connect_source,
+            source,
+            self.rssi_by_source,
+        )
+        try:
+            if self._stopping:
+                return
+            # Shielded so that stopping mid-migration still closes the link.
+            await asyncio.shield(self._execute_disconnect())
+            self.migrations += 1
+            await self.initialise()
+        except BLEAK_EXCEPTIONS as error:
+            _LOGGER.debug("%s: Failed to migrate connection: %s", self.name, error)
+            if not self._stopping:
+                asyncio.create_task(self._reconnect())
+        finally:
+            self._migrate_task = None
 
     def intify(self, state: bytes) -> int:
         return int.from_bytes(state, byteorder="little")
@@ -220,8 +366,102 @@ class IQOSBLE:
             self._state,
         )
 
+    async def upload_firmware(
+        self,
+        path: str | os.PathLike[str],
+        window: int = DEFAULT_WINDOW,
+        progress_callback: Callable[[FirmwareUploadProgress], None] | None = None,
+        resume_attempts: int = FIRMWARE_RESUME_ATTEMPTS,
+    ) -> FirmwareUploadProgress:
+        """Stream a firmware image to the device, resuming after disconnects."""
+        async with self._operation_lock:
+            uploader: FirmwareUploader | None = None
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        # Reconnect through initialise so the resumed link is
+                        # subscribed to state notifications again.
+                        if not self.is_connected:
+                            await self.initialise()
+                        client = self._client
+                        if client is None:
+                            raise BleakError("Not connected")
+                        for uuid in (
+                            CHARACTERISTIC_FW_UPGRADE_CONTROL,
+                            CHARACTERISTIC_FW_UPGRADE_STATUS,
+                        ):
+                            if not client.services.get_characteristic(uuid):
+                                raise CharacteristicMissingError(uuid)
+                        # The MTU is negotiated per link, so the packets are
+                        # resized on every reconnect.
+                        chunk_size = max(
+                            client.mtu_size - ATT_HEADER_SIZE - FW_PACKET_HEADER_SIZE,
+                            1,
+                        )
+                        if uploader is None:
+                            uploader = FirmwareUploader(
+                                path,
+                                self._write_firmware,
+                                chunk_size=chunk_size,
+                                window=window,
+                                progress_callback=progress_callback,
+                            )
+                        else:
+                            uploader.chunk_size = chunk_size
+                        self._firmware_uploader = uploader
+                        _LOGGER.debug(
+                            "%s: Uploading firmware from offset %s; RSSI: %s",
+                            self.name,
+                            uploader.confirmed_offset,
+                            self.rssi,
+                        )
+                        await client.start_notify(
+                            CHARACTERISTIC_FW_UPGRADE_STATUS, uploader.handle_status
+                        )
+                        try:
+                            return await uploader.upload()
+                        finally:
+                            if client.is_connected:
+                                with contextlib.suppress(*BLEAK_EXCEPTIONS):
+                                    await client.stop_notify(
+                                        CHARACTERISTIC_FW_UPGRADE_STATUS
+                                    )
+                    except (FirmwareUploadError, *BLEAK_EXCEPTIONS) as error:
+                        attempt += 1
+                        if attempt > resume_attempts:
+                            raise FirmwareUploadError(
+                                f"{self.name}: Firmware upload failed after "
+                                f"{resume_attempts} resume attempts"
+                            ) from error
+                        _LOGGER.debug(
+                            "%s: Firmware upload interrupted, resuming: %s",
+                            self.name,
+                            error,
+                        )
+                        await asyncio.sleep(BLEAK_BACKOFF_TIME)
+            finally:
+                self._firmware_uploader = None
+
+    async def _write_firmware(self, packet: bytes) -> None:
+        """Write a firmware packet without response."""
+        if self._client is None:
+            raise BleakError("Not connected")
+        await self._client.write_gatt_char(
+            CHARACTERISTIC_FW_UPGRADE_CONTROL, packet, response=False
+        )
+
     def _disconnected(self, client: BleakClientWithServiceCache) -> None:
         """Disconnected callback."""
+        if self._client is not None and client is not self._client:
+            _LOGGER.debug("%s: Previous connection closed", self.name)
+            return
+        if self._firmware_uploader is not None:
+            self._firmware_uploader.handle_disconnect()
+        if self._stopping:
+            self._expected_disconnect = True
+        if not self._expected_disconnect and self._lazy_connect:
+            self._reconnect_pending = True
         self._fire_disconnected_callbacks()
         if self._expected_disconnect:
             _LOGGER.debug(
@@ -233,6 +473,8 @@ class IQOSBLE:
             self.name,
             self.rssi,
         )
+        if self._lazy_connect:
+            return
         asyncio.create_task(self._reconnect())
 
     def _disconnect(self) -> None:
@@ -8,3 +8,19 @@ class IQOSBLEState:
     case_battery: int = 0
     pen_discharged: bool = True
     is_open: bool = False
+
+
+@dataclass(frozen=True)
+class FirmwareUploadProgress:
+    offset: int = 0
+    total: int = 0
+    elapsed: float = 0.0
+    bytes_per_second: float = 0.0
+    eta: float | None = None
+
+    @property
+    def percent(self) -> float:
+        """Return the confirmed share of the image."""
+        if not self.total:
+            return 0.0
+        return 100.0 * self.offset / self.total
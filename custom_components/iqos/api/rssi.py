@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+RSSI_SMOOTHING = 0.3
+RSSI_STALE_SECONDS = 60.0
+MIGRATION_HYSTERESIS_DB = 8.0
+MIGRATION_MIN_SAMPLES = 3
+MIGRATION_MIN_INTERVAL = 300.0
+
+NEVER_TIME = -86400.0
+
+
+@dataclass
+class SourceRssi:
+    average: float
+    samples: int
+    last_seen: float
+
+
+class RssiTracker:
+    """Smoothed RSSI of a device as seen by each scanner source.
+
+    Another source is only a migration target once it has been heard at
+    least ``min_samples`` times with an average ``hysteresis`` dB above the
+    source the device connected through, and no sooner than ``min_interval``
+    seconds after the last connect, so two scanners with similar signal do
+    not bounce the link between them.
+    """
+
+    def __init__(
+        self,
+        smoothing: float = RSSI_SMOOTHING,
+        stale_after: float = RSSI_STALE_SECONDS,
+        hysteresis: float = MIGRATION_HYSTERESIS_DB,
+        min_samples: int = MIGRATION_MIN_SAMPLES,
+        min_interval: float = MIGRATION_MIN_INTERVAL,
+    ) -> None:
+        """Init the RssiTracker."""
+        self._smoothing = smoothing
+        self._stale_after = stale_after
+        self._hysteresis = hysteresis
+        self._min_samples = min_samples
+        self._min_interval = min_interval
+        self._sources: dict[str, SourceRssi] = {}
+        self._connected_time = NEVER_TIME
+
+    @property
+    def smoothing(self) -> float:
+        """Return the weight of a new sample in the moving average."""
+        return self._smoothing
+
+    @smoothing.setter
+    def smoothing(self, smoothing: float) -> None:
+        """Set the weight of a new sample in the moving average."""
+        self._smoothing = smoothing
+
+    @property
+    def sources(self) -> dict[str, SourceRssi]:
+        """Return the tracked sources."""
+        return self._sources
+
+    def update(self, source: str, rssi: int, now: float | None = None) -> float:
+        """Fold an advertisement into the moving average of its source."""
+        now = time.monotonic() if now is None else now
+        if (tracked := self._sources.get(source)) is None or self._is_stale(
+            tracked, now
+        ):
+            tracked = self._sources[source] = SourceRssi(float(rssi), 0, now)
+        else:
+            tracked.average += self._smoothing * (rssi - tracked.average)
+        tracked.samples += 1
+        tracked.last_seen = now
+        return tracked.average
+
+    def average(self, source: str, now: float | None = None) -> float | None:
+        """Return the smoothed RSSI of a source, None when not heard lately."""
+        now = time.monotonic() if now is None else now
+        tracked = self._sources.get(source)
+        if tracked is None or self._is_stale(tracked, now):
+            return None
+        return tracked.average
+
+    def best_source(self, now: float | None = None) -> str | None:
+        """Return the source with the strongest recent signal."""
+        now = time.monotonic() if now is None else now
+        fresh = {
+            source: tracked.average
+            for source, tracked in self._sources.items()
+            if not self._is_stale(tracked, now)
+        }
+        if not fresh:
+            return None
+        return max(fresh, key=fresh.__getitem__)
+
+    def connected(self, now: float | None = None) -> None:
+        """Record a new connection, which restarts the migration hold-off."""
+        self._connected_time = time.monotonic() if now is None else now
+
+    def migration_target(
+        self, current: str | None, now: float | None = None
+    ) -> str | None:
+        """Return a clearly better source than the connected one, if any."""
+        now = time.monotonic() if now is None else now
+        if current is None or now - self._connected_time < self._min_interval:
+            return None
+        if (best := self.best_source(now)) is None or best == current:
+            return None
+        # Without recent advertisements through the connected source there
+        # is nothing to compare against, keep the link where it is.
+        if (current_average := self.average(current, now)) is None:
+            return None
+        candidate = self._sources[best]
+        if (
+            candidate.samples < self._min_samples
+            or candidate.average - current_average < self._hysteresis
+        ):
+            return None
+        return best
+
+    def _is_stale(self, tracked: SourceRssi, now: float) -> bool:
+        return now - tracked.last_seen > self._stale_after
@@ -13,10 +13,37 @@ from homeassistant.components.bluetooth import (
     BluetoothServiceInfoBleak,
     async_discovered_service_info,
 )
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_ADDRESS
-
-from .const import DOMAIN, LOCAL_NAMES
+from homeassistant.core import callback
+
+from .const import (
+    CONF_CONNECTION_MODE,
+    CONF_DEBOUNCE_SECONDS,
+    CONF_REPLACE_SENSOR_STATISTICS,
+    CONF_LONG_TERM_STATISTICS,
+    CONF_PROFILE,
+    CONF_RETRY_ATTEMPTS,
+    CONF_RSSI_HISTORY,
+    CONNECTION_MODE_LAZY,
+    CONNECTION_MODE_PERSISTENT,
+    DEFAULT_REPLACE_SENSOR_STATISTICS,
+    DEFAULT_LONG_TERM_STATISTICS,
+    DEFAULT_PROFILE,
+    DOMAIN,
+    LOCAL_NAMES,
+    PROFILE_BALANCED,
+    PROFILE_CUSTOM,
+    PROFILE_LOW_LATENCY,
+    PROFILE_LOW_POWER,
+    TUNING_PROFILES,
+)
+from .models import IQOSTuning
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +58,12 @@ class IqosConfigFlow(ConfigFlow, domain=DOMAIN):
         self._discovery_info: BluetoothServiceInfoBleak | None = None
         self._discovered_devices: dict[str, BluetoothServiceInfoBleak] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow for this handler."""
+        return IqosOptionsFlow()
+
     async def async_step_bluetooth(
         self, discovery_info: BluetoothServiceInfoBleak
     ) -> ConfigFlowResult:
@@ -110,3 +143,86 @@ class IqosConfigFlow(ConfigFlow, domain=DOMAIN):
             data_schema=data_schema,
             errors=errors,
         )
+
+
+class IqosOptionsFlow(OptionsFlow):
+    """Handle an options flow for IQOS BLE."""
+
+    def __init__(self) -> None:
+        """Initialize the options flow."""
+        self._options: dict[str, Any] = {}
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            profile = user_input[CONF_PROFILE]
+            if profile == PROFILE_CUSTOM:
+                self._options = user_input
+                return await self.async_step_custom()
+            return self.async_create_entry(
+                data={**user_input, **TUNING_PROFILES[profile]}
+            )
+
+        options = self.config_entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_PROFILE,
+                    default=options.get(CONF_PROFILE, DEFAULT_PROFILE),
+                ): vol.In(
+                    {
+                        PROFILE_LOW_POWER: "Low power",
+                        PROFILE_BALANCED: "Balanced",
+                        PROFILE_LOW_LATENCY: "Low latency",
+                        PROFILE_CUSTOM: "Custom",
+                    }
+                ),
+                vol.Required(
+                    CONF_LONG_TERM_STATISTICS,
+                    default=options.get(
+                        CONF_LONG_TERM_STATISTICS, DEFAULT_LONG_TERM_STATISTICS
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_REPLACE_SENSOR_STATISTICS,
+                    default=options.get(
+                        CONF_REPLACE_SENSOR_STATISTICS,
+                        DEFAULT_REPLACE_SENSOR_STATISTICS,
+                    ),
+                ): bool,
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=data_schema)
+
+    async def async_step_custom(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the individual tuning options."""
+        if user_input is not None:
+            return self.async_create_entry(data={**self._options, **user_input})
+
+        tuning = IQOSTuning.from_options(self.config_entry.options)
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_DEBOUNCE_SECONDS, default=tuning.debounce_seconds
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Required(
+                    CONF_RETRY_ATTEMPTS, default=tuning.retry_attempts
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Required(
+                    CONF_CONNECTION_MODE, default=tuning.connection_mode
+                ): vol.In(
+                    {
+                        CONNECTION_MODE_PERSISTENT: "Persistent",
+                        CONNECTION_MODE_LAZY: "Lazy",
+                    }
+                ),
+                vol.Required(CONF_RSSI_HISTORY, default=tuning.rssi_history): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=100)
+                ),
+            }
+        )
+        return self.async_show_form(step_id="custom", data_schema=data_schema)
@@ -3,3 +3,52 @@
 DOMAIN = "iqos"
 
 LOCAL_NAMES = {"IQOS ILUMA"}
+
+DATA_UPDATE_HUB = f"{DOMAIN}_update_hub"
+UPDATE_HUB_WINDOW = 0.05
+UPDATE_HUB_MAX_DEVICES = 50
+
+DATA_STATISTICS_HUB = f"{DOMAIN}_statistics_hub"
+
+CONF_LONG_TERM_STATISTICS = "long_term_statistics"
+CONF_REPLACE_SENSOR_STATISTICS = "replace_sensor_statistics"
+
+DEFAULT_LONG_TERM_STATISTICS = False
+DEFAULT_REPLACE_SENSOR_STATISTICS = True
+
+CONF_PROFILE = "profile"
+CONF_DEBOUNCE_SECONDS = "debounce_seconds"
+CONF_RETRY_ATTEMPTS = "retry_attempts"
+CONF_CONNECTION_MODE = "connection_mode"
+CONF_RSSI_HISTORY = "rssi_history"
+
+PROFILE_LOW_POWER = "low_power"
+PROFILE_BALANCED = "balanced"
+PROFILE_LOW_LATENCY = "low_latency"
+PROFILE_CUSTOM = "custom"
+DEFAULT_PROFILE = PROFILE_BALANCED
+
+CONNECTION_MODE_PERSISTENT = "persistent"
+CONNECTION_MODE_LAZY = "lazy"
+
+# A retry budget of 0 keeps retrying until the device is found again.
+TUNING_PROFILES = {
+    PROFILE_LOW_POWER: {
+        CONF_DEBOUNCE_SECONDS: 5.0,
+        CONF_RETRY_ATTEMPTS: 3,
+        CONF_CONNECTION_MODE: CONNECTION_MODE_LAZY,
+        CONF_RSSI_HISTORY: 10,
+    },
+    PROFILE_BALANCED: {
+        CONF_DEBOUNCE_SECONDS: 1.0,
+        CONF_RETRY_ATTEMPTS: 0,
+        CONF_CONNECTION_MODE: CONNECTION_MODE_PERSISTENT,
+        CONF_RSSI_HISTORY: 5,
+    },
+    PROFILE_LOW_LATENCY: {
+        CONF_DEBOUNCE_SECONDS: 0.0,
+        CONF_RETRY_ATTEMPTS: 0,
+        CONF_CONNECTION_MODE: CONNECTION_MODE_PERSISTENT,
+        CONF_RSSI_HISTORY: 3,
+    },
+}
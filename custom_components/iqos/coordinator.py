@@ -11,6 +11,7 @@ from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import DOMAIN
+from .hub import IQOSUpdateHub
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,7 +22,9 @@ DEBOUNCE_SECONDS = 1.0
 class IQOSBLECoordinator(DataUpdateCoordinator[None]):
     """Data coordinator for receiving IQOS updates."""
 
-    def __init__(self, hass: HomeAssistant, iqos_ble: IQOSBLE) -> None:
+    def __init__(
+        self, hass: HomeAssistant, iqos_ble: IQOSBLE, hub: IQOSUpdateHub
+    ) -> None:
         """Initialise the coordinator."""
         super().__init__(
             hass,
@@ -29,10 +32,13 @@ class IQOSBLECoordinator(DataUpdateCoordinator[None]):
             name=DOMAIN,
         )
         self._iqos_ble = iqos_ble
+        self._hub = hub
+        self._data_updated = False
         iqos_ble.register_callback(self._async_handle_update)
         iqos_ble.register_disconnected_callback(self._async_handle_disconnect)
         self.connected = False
         self._last_update_time = NEVER_TIME
+        self.debounce_seconds = DEBOUNCE_SECONDS
         self._debounce_cancel: CALLBACK_TYPE | None = None
         self._debounced_update_job = HassJob(
             self._async_handle_debounced_update,
@@ -44,7 +50,22 @@ class IQOSBLECoordinator(DataUpdateCoordinator[None]):
         """Handle debounced update."""
         self._debounce_cancel = None
         self._last_update_time = time.monotonic()
-        self.async_set_updated_data(None)
+        self._async_schedule_flush(data_updated=True)
+
+    @callback
+    def _async_schedule_flush(self, data_updated: bool) -> None:
+        """Queue the listeners on the update hub."""
+        self._data_updated |= data_updated
+        self._hub.async_mark_dirty(self)
+
+    @callback
+    def async_flush(self) -> None:
+        """Trigger the callbacks, called by the update hub."""
+        if self._data_updated:
+            self._data_updated = False
+            self.async_set_updated_data(None)
+        else:
+            self.async_update_listeners()
 
     @callback
     def _async_handle_update(self, state: IQOSBLEState) -> None:
@@ -52,23 +73,24 @@ class IQOSBLECoordinator(DataUpdateCoordinator[None]):
         self.connected = True
         previous_last_updated_time = self._last_update_time
         self._last_update_time = time.monotonic()
-        if self._last_update_time - previous_last_updated_time >= DEBOUNCE_SECONDS:
-            self.async_set_updated_data(None)
+        if self._last_update_time - previous_last_updated_time >= self.debounce_seconds:
+            self._async_schedule_flush(data_updated=True)
             return
         if self._debounce_cancel is None:
             self._debounce_cancel = async_call_later(
-                self.hass, DEBOUNCE_SECONDS, self._debounced_update_job
+                self.hass, self.debounce_seconds, self._debounced_update_job
             )
 
     @callback
     def _async_handle_disconnect(self) -> None:
         """Trigger the callbacks for disconnected."""
         self.connected = False
-        self.async_update_listeners()
+        self._async_schedule_flush(data_updated=False)
 
     async def async_shutdown(self) -> None:
         """Shutdown the coordinator."""
         if self._debounce_cancel is not None:
             self._debounce_cancel()
             self._debounce_cancel = None
+        self._hub.async_discard(self)
         await super().async_shutdown()
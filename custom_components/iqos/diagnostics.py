@@ -0,0 +1,31 @@
+"""Diagnostics support for IQOS."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .models import IQOSBLEData
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: IQOSBLEData = hass.data[DOMAIN][entry.entry_id]
+    device = data.device
+    return {
+        "options": dict(entry.options),
+        "state": asdict(device.state),
+        "connection": {
+            "connected": device.is_connected,
+            "connect_source": device.connect_source,
+            "rssi_by_source": device.rssi_by_source,
+            "migrations": device.migrations,
+            "reconnect_pending": device.reconnect_pending,
+        },
+    }
@@ -0,0 +1,81 @@
+"""Batch entity updates of all IQOS coordinators."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_UPDATE_HUB, UPDATE_HUB_MAX_DEVICES, UPDATE_HUB_WINDOW
+
+if TYPE_CHECKING:
+    from .coordinator import IQOSBLECoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IQOSUpdateHub:
+    """Collect dirty coordinators and flush their listeners together.
+
+    A coordinator marked dirty more than once before a flush keeps its place
+    in the queue and is flushed once, so devices are written in the order
+    they first changed. Each flush handles at most ``max_devices``
+    coordinators, the rest are flushed on the next loop iteration.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        window: float = UPDATE_HUB_WINDOW,
+        max_devices: int = UPDATE_HUB_MAX_DEVICES,
+    ) -> None:
+        """Initialise the hub."""
+        self._hass = hass
+        self._window = window
+        self._max_devices = max_devices
+        self._dirty: dict[IQOSBLECoordinator, None] = {}
+        self._flush_handle: asyncio.Handle | None = None
+        self.flushes = 0
+
+    @callback
+    def async_mark_dirty(self, coordinator: IQOSBLECoordinator) -> None:
+        """Queue the listeners of a coordinator for the next flush."""
+        self._dirty.setdefault(coordinator)
+        if self._flush_handle is None:
+            if self._window:
+                self._flush_handle = self._hass.loop.call_later(
+                    self._window, self._async_flush
+                )
+            else:
+                self._flush_handle = self._hass.loop.call_soon(self._async_flush)
+
+    @callback
+    def async_discard(self, coordinator: IQOSBLECoordinator) -> None:
+        """Drop a coordinator that is shutting down."""
+        self._dirty.pop(coordinator, None)
+        if not self._dirty and self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    @callback
+    def _async_flush(self) -> None:
+        """Flush the listeners of the queued coordinators."""
+        self._flush_handle = None
+        self.flushes += 1
+        for _ in range(min(len(self._dirty), self._max_devices)):
+            coordinator = next(iter(self._dirty))
+            del self._dirty[coordinator]
+            coordinator.async_flush()
+        if self._dirty:
+            _LOGGER.debug("%s devices left for the next flush", len(self._dirty))
+            self._flush_handle = self._hass.loop.call_soon(self._async_flush)
+
+
+@callback
+def async_get_update_hub(hass: HomeAssistant) -> IQOSUpdateHub:
+    """Return the update hub shared by all IQOS entries."""
+    if (hub := hass.data.get(DATA_UPDATE_HUB)) is None:
+        hub = hass.data[DATA_UPDATE_HUB] = IQOSUpdateHub(hass)
+    return hub
@@ -2,11 +2,36 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
+from typing import Any
 
 from .api import IQOSBLE
 
+from .const import CONF_PROFILE, DEFAULT_PROFILE, TUNING_PROFILES
 from .coordinator import IQOSBLECoordinator
+from .statistics import IQOSStatistics
+
+
+@dataclass(frozen=True)
+class IQOSTuning:
+    """Transport and performance tuning of a holder."""
+
+    debounce_seconds: float
+    retry_attempts: int
+    connection_mode: str
+    rssi_history: int
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> IQOSTuning:
+        """Resolve the tuning of an entry, falling back to its profile."""
+        profile = TUNING_PROFILES.get(
+            options.get(CONF_PROFILE, DEFAULT_PROFILE),
+            TUNING_PROFILES[DEFAULT_PROFILE],
+        )
+        return cls(
+            **{key: options.get(key, default) for key, default in profile.items()}
+        )
 
 
 @dataclass
@@ -16,3 +41,5 @@ class IQOSBLEData:
     title: str
     device: IQOSBLE
     coordinator: IQOSBLECoordinator
+    options: Mapping[str, Any]
+    statistics: IQOSStatistics | None = None
@@ -1,5 +1,7 @@
 """IQOS integration sensor platform."""
 
+from dataclasses import replace
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -16,7 +18,11 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import IQOSBLECoordinator
 from .api import IQOSBLE
-from .const import DOMAIN
+from .const import (
+    CONF_REPLACE_SENSOR_STATISTICS,
+    DEFAULT_REPLACE_SENSOR_STATISTICS,
+    DOMAIN,
+)
 from .models import IQOSBLEData
 
 SENSOR_DESCRIPTIONS = [
@@ -39,6 +45,15 @@ async def async_setup_entry(
 ) -> None:
     """Set up the platform for IQOS."""
     data: IQOSBLEData = hass.data[DOMAIN][entry.entry_id]
+    descriptions = SENSOR_DESCRIPTIONS
+    if data.statistics is not None and data.options.get(
+        CONF_REPLACE_SENSOR_STATISTICS, DEFAULT_REPLACE_SENSOR_STATISTICS
+    ):
+        # The hourly external statistics replace the ones the recorder
+        # compiles for the sensor. Its states are still recorded.
+        descriptions = [
+            replace(description, state_class=None) for description in descriptions
+        ]
     async_add_entities(
         IQOSBLESensor(
             data.coordinator,
@@ -46,7 +61,7 @@ async def async_setup_entry(
             entry.title,
             description,
         )
-        for description in SENSOR_DESCRIPTIONS
+        for description in descriptions
     )
 
 
@@ -0,0 +1,256 @@
+"""Hourly long-term statistics for IQOS holders."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any
+
+from .api import IQOSBLE, IQOSBLEState
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import PERCENTAGE
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DATA_STATISTICS_HUB, DOMAIN
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # Home Assistant before 2025.4
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+ClosedPeriod = tuple[datetime, StatisticData | None, int]
+
+
+def _mean_metadata(has_mean: bool) -> dict[str, Any]:
+    """Describe the mean of a statistic, has_mean is removed in 2026.4."""
+    if StatisticMeanType is None:
+        return {"has_mean": has_mean}
+    return {
+        "mean_type": StatisticMeanType.ARITHMETIC
+        if has_mean
+        else StatisticMeanType.NONE
+    }
+
+
+class IQOSStatistics:
+    """Aggregate holder updates in memory until the hour is closed."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        iqos_ble: IQOSBLE,
+        name: str,
+        hub: IQOSStatisticsHub,
+    ) -> None:
+        """Initialise the aggregator."""
+        self._hass = hass
+        self._iqos_ble = iqos_ble
+        self._hub = hub
+        object_id = slugify(iqos_ble.address)
+        self.battery_metadata = StatisticMetaData(
+            **_mean_metadata(True),
+            has_sum=False,
+            name=f"{name} Case Battery",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:{object_id}_case_battery",
+            unit_of_measurement=PERCENTAGE,
+        )
+        self.usage_metadata = StatisticMetaData(
+            **_mean_metadata(False),
+            has_sum=True,
+            name=f"{name} Usage",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:{object_id}_usage",
+            unit_of_measurement=None,
+        )
+        self._period_start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        self._battery: int | None = None
+        self._battery_since = self._period_start
+        self._battery_min: int | None = None
+        self._battery_max: int | None = None
+        self._battery_weighted = 0.0
+        self._battery_seconds = 0.0
+        self._is_open = iqos_ble.is_open
+        self._usage = 0
+        self.usage_sum: float | None = None
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start aggregating, returns a callable that stops it."""
+        unsub_update = self._iqos_ble.register_callback(self._async_handle_update)
+        unsub_hub = self._hub.async_add(self)
+
+        @callback
+        def _async_stop() -> None:
+            unsub_update()
+            unsub_hub()
+
+        return _async_stop
+
+    @callback
+    def _async_handle_update(self, state: IQOSBLEState) -> None:
+        """Fold a raw holder update into the current period."""
+        now = dt_util.utcnow()
+        self._async_accumulate(now)
+        self._battery = state.case_battery
+        self._battery_since = now
+        self._battery_min = (
+            state.case_battery
+            if self._battery_min is None
+            else min(self._battery_min, state.case_battery)
+        )
+        self._battery_max = (
+            state.case_battery
+            if self._battery_max is None
+            else max(self._battery_max, state.case_battery)
+        )
+        if state.is_open and not self._is_open:
+            self._usage += 1
+        self._is_open = state.is_open
+
+    @callback
+    def _async_accumulate(self, now: datetime) -> None:
+        """Weight the current battery level by how long it was held."""
+        if self._battery is None:
+            return
+        seconds = (now - self._battery_since).total_seconds()
+        self._battery_weighted += self._battery * seconds
+        self._battery_seconds += seconds
+
+    @callback
+    def async_close_period(self, now: datetime) -> ClosedPeriod | None:
+        """Close the period, returns its start and aggregates."""
+        start = self._period_start
+        end = now.replace(minute=0, second=0, microsecond=0)
+        if end <= start:
+            return None
+        self._async_accumulate(end)
+        battery: StatisticData | None = None
+        if self._battery_seconds:
+            battery = StatisticData(
+                start=start,
+                min=self._battery_min,
+                max=self._battery_max,
+                mean=self._battery_weighted / self._battery_seconds,
+            )
+        usage = self._usage
+        self._period_start = end
+        self._battery_since = end
+        self._battery_min = self._battery_max = self._battery
+        self._battery_weighted = 0.0
+        self._battery_seconds = 0.0
+        self._usage = 0
+        return start, battery, usage
+
+    @callback
+    def async_add_statistics(
+        self, start: datetime, battery: StatisticData | None, usage: int
+    ) -> None:
+        """Hand the aggregates of a closed period to the recorder."""
+        if battery is not None:
+            async_add_external_statistics(self._hass, self.battery_metadata, [battery])
+        self.usage_sum = (self.usage_sum or 0.0) + usage
+        async_add_external_statistics(
+            self._hass,
+            self.usage_metadata,
+            [StatisticData(start=start, state=usage, sum=self.usage_sum)],
+        )
+
+
+class IQOSStatisticsHub:
+    """Close the period of every holder on one timer and push them together.
+
+    The recorder only takes external statistics one statistic id at a time,
+    so the hub queues the statistics of all holders from a single job,
+    which the recorder then commits together. Usage sums that are not known
+    yet are loaded from the recorder in one executor job.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise the hub."""
+        self._hass = hass
+        self._aggregators: dict[IQOSStatistics, None] = {}
+        self._unsub_time: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add(self, statistics: IQOSStatistics) -> CALLBACK_TYPE:
+        """Close the periods of a holder with the others."""
+        self._aggregators[statistics] = None
+        if self._unsub_time is None:
+            self._unsub_time = async_track_utc_time_change(
+                self._hass, self._async_handle_period_end, minute=0, second=0
+            )
+
+        @callback
+        def _async_remove() -> None:
+            self._aggregators.pop(statistics, None)
+            if not self._aggregators and self._unsub_time is not None:
+                self._unsub_time()
+                self._unsub_time = None
+
+        return _async_remove
+
+    @callback
+    def _async_handle_period_end(self, now: datetime) -> None:
+        """Close the period of every holder and push the aggregates."""
+        closed = [
+            (statistics, period)
+            for statistics in self._aggregators
+            if (period := statistics.async_close_period(now)) is not None
+        ]
+        if closed:
+            self._hass.async_create_task(self._async_push(closed), "IQOS statistics")
+
+    async def _async_push(
+        self, closed: list[tuple[IQOSStatistics, ClosedPeriod]]
+    ) -> None:
+        """Push the statistics of closed periods to the recorder."""
+        _LOGGER.debug("Pushing statistics of %s holders", len(closed))
+        if missing := [
+            statistics for statistics, _ in closed if statistics.usage_sum is None
+        ]:
+            usage_sums = await self._async_last_usage_sums(
+                [statistics.usage_metadata["statistic_id"] for statistics in missing]
+            )
+            for statistics in missing:
+                statistics.usage_sum = usage_sums[
+                    statistics.usage_metadata["statistic_id"]
+                ]
+        for statistics, period in closed:
+            statistics.async_add_statistics(*period)
+
+    async def _async_last_usage_sums(
+        self, statistic_ids: list[str]
+    ) -> dict[str, float]:
+        """Load the usage sums the recorder already has."""
+        return await get_instance(self._hass).async_add_executor_job(
+            _last_usage_sums, self._hass, statistic_ids
+        )
+
+
+def _last_usage_sums(hass: HomeAssistant, statistic_ids: list[str]) -> dict[str, float]:
+    """Read the last usage sum of each statistic, runs in the executor."""
+    usage_sums: dict[str, float] = {}
+    for statistic_id in statistic_ids:
+        last = get_last_statistics(hass, 1, statistic_id, True, {"sum"})
+        rows = last.get(statistic_id)
+        usage_sums[statistic_id] = (rows[0].get("sum") or 0.0) if rows else 0.0
+    return usage_sums
+
+
+@callback
+def async_get_statistics_hub(hass: HomeAssistant) -> IQOSStatisticsHub:
+    """Return the statistics hub shared by all IQOS entries."""
+    if (hub := hass.data.get(DATA_STATISTICS_HUB)) is None:
+        hub = hass.data[DATA_STATISTICS_HUB] = IQOSStatisticsHub(hass)
+    return hub
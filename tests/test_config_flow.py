@@ -0,0 +1,149 @@
+"""Test the IQOS options flow."""
+
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.iqos.models import IQOSBLEData
+from custom_components.iqos.const import (
+    CONF_CONNECTION_MODE,
+    CONF_DEBOUNCE_SECONDS,
+    CONF_REPLACE_SENSOR_STATISTICS,
+    CONF_LONG_TERM_STATISTICS,
+    CONF_PROFILE,
+    CONF_RETRY_ATTEMPTS,
+    CONF_RSSI_HISTORY,
+    CONNECTION_MODE_LAZY,
+    DOMAIN,
+    PROFILE_CUSTOM,
+    PROFILE_LOW_POWER,
+    TUNING_PROFILES,
+)
+from homeassistant.const import CONF_ADDRESS
+from homeassistant.data_entry_flow import FlowResultType
+
+from .test_iqos_ble import SimulatedHolder
+
+
+def _entry(hass) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN, title="IQOS", data={CONF_ADDRESS: "AA:BB:CC:DD:EE:FF"}
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def holder():
+    """Replace the bluetooth stack with a simulated holder."""
+    holder = SimulatedHolder()
+    device = MagicMock(address="AA:BB:CC:DD:EE:FF")
+    device.name = "IQOS ILUMA"
+    with patch(
+        "custom_components.iqos.close_stale_connections_by_address", AsyncMock()
+    ), patch(
+        "homeassistant.components.bluetooth.async_ble_device_from_address",
+        return_value=device,
+    ), patch(
+        "homeassistant.components.bluetooth.async_scanner_devices_by_address",
+        return_value=[],
+    ), patch(
+        "homeassistant.components.bluetooth.async_register_callback",
+        return_value=Mock(),
+    ), patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ):
+        yield holder
+
+
+async def test_options_profile(hass):
+    """Test picking a profile stores its tuning."""
+    entry = _entry(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_PROFILE: PROFILE_LOW_POWER,
+            CONF_LONG_TERM_STATISTICS: True,
+            CONF_REPLACE_SENSOR_STATISTICS: False,
+        },
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options == {
+        CONF_PROFILE: PROFILE_LOW_POWER,
+        CONF_LONG_TERM_STATISTICS: True,
+        CONF_REPLACE_SENSOR_STATISTICS: False,
+        **TUNING_PROFILES[PROFILE_LOW_POWER],
+    }
+
+
+async def test_options_custom(hass):
+    """Test the custom profile asks for each tuning option."""
+    entry = _entry(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_PROFILE: PROFILE_CUSTOM,
+            CONF_LONG_TERM_STATISTICS: False,
+            CONF_REPLACE_SENSOR_STATISTICS: False,
+        },
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "custom"
+
+    custom = {
+        CONF_DEBOUNCE_SECONDS: 2.5,
+        CONF_RETRY_ATTEMPTS: 10,
+        CONF_CONNECTION_MODE: CONNECTION_MODE_LAZY,
+        CONF_RSSI_HISTORY: 7,
+    }
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], custom
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.options == {
+        CONF_PROFILE: PROFILE_CUSTOM,
+        CONF_LONG_TERM_STATISTICS: False,
+        CONF_REPLACE_SENSOR_STATISTICS: False,
+        **custom,
+    }
+
+
+async def test_options_applied_live(hass, holder):
+    """Test saving a profile tunes the running holder without a reload."""
+    entry = _entry(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    data: IQOSBLEData = hass.data[DOMAIN][entry.entry_id]
+
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        await hass.config_entries.options.async_configure(
+            result["flow_id"], {CONF_PROFILE: PROFILE_LOW_POWER}
+        )
+        await hass.async_block_till_done()
+
+    reload.assert_not_called()
+    profile = TUNING_PROFILES[PROFILE_LOW_POWER]
+    assert data.coordinator.debounce_seconds == profile[CONF_DEBOUNCE_SECONDS]
+    assert data.device._max_attempts == profile[CONF_RETRY_ATTEMPTS]
+    assert data.device._lazy_connect
+
+    with patch.object(hass.config_entries, "async_reload") as reload:
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            {CONF_PROFILE: PROFILE_LOW_POWER, CONF_LONG_TERM_STATISTICS: True},
+        )
+        await hass.async_block_till_done()
+
+    reload.assert_called_once_with(entry.entry_id)
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,213 @@
+"""Test the firmware upload engine against a simulated device."""
+
+import asyncio
+
+import pytest
+
+from custom_components.iqos.api.const import FW_STATUS_OK, FW_STATUS_REJECTED
+from custom_components.iqos.api.exceptions import FirmwareUploadError
+from custom_components.iqos.api.firmware import (
+    FirmwareUploader,
+    build_firmware_status,
+    parse_firmware_packet,
+)
+
+
+class SimulatedFirmwareDevice:
+    """Device side of the firmware upgrade characteristics."""
+
+    def __init__(
+        self,
+        window: int,
+        disconnect_after: int | None = None,
+        reject_windows: int = 0,
+    ) -> None:
+        """Initialize the simulated device."""
+        self.window = window
+        self.disconnect_after = disconnect_after
+        self.reject_windows = reject_windows
+        self.image = bytearray()
+        self.confirmed = 0
+        self.unacked = 0
+        self.max_unacked = 0
+        self.packets = 0
+        self.offsets: list[int] = []
+        self.connected = True
+        self.uploader: FirmwareUploader | None = None
+
+    def _notify(self, code: int, tag: int, offset: int) -> None:
+        asyncio.get_running_loop().call_soon(
+            self.uploader.handle_status, 0, build_firmware_status(code, tag, offset)
+        )
+
+    def reconnect(self) -> None:
+        """Reconnect, dropping anything that was not acknowledged."""
+        del self.image[self.confirmed :]
+        self.unacked = 0
+        self.connected = True
+
+    async def write(self, packet: bytes) -> None:
+        """Handle a write without response on the control characteristic."""
+        if not self.connected:
+            raise FirmwareUploadError("not connected")
+        self.packets += 1
+        if self.packets == self.disconnect_after:
+            self.connected = False
+            self.uploader.handle_disconnect()
+            return
+        ack_request, tag, offset, payload = parse_firmware_packet(packet)
+        self.offsets.append(offset)
+        if (
+            offset != len(self.image)
+            or self.unacked >= self.window
+            or (ack_request and self.reject_windows)
+        ):
+            self.reject_windows = max(self.reject_windows - 1, 0)
+            self._notify(FW_STATUS_REJECTED, tag, self.confirmed)
+            del self.image[self.confirmed :]
+            self.unacked = 0
+            return
+        self.image += payload
+        self.unacked += 1
+        self.max_unacked = max(self.max_unacked, self.unacked)
+        if ack_request:
+            self.confirmed = len(self.image)
+            self.unacked = 0
+            self._notify(FW_STATUS_OK, tag, self.confirmed)
+
+
+@pytest.fixture
+def firmware_image(tmp_path):
+    """Write a firmware image to disk."""
+    data = bytes(i * 7 % 251 for i in range(10_000))
+    path = tmp_path / "firmware.bin"
+    path.write_bytes(data)
+    return path, data
+
+
+async def test_upload_streams_image_in_windows(firmware_image):
+    """Test the image is sent in windows acknowledged by the device."""
+    path, data = firmware_image
+    device = SimulatedFirmwareDevice(window=4)
+    progress = []
+    uploader = FirmwareUploader(
+        path, device.write, chunk_size=15, window=4, progress_callback=progress.append
+    )
+    device.uploader = uploader
+
+    result = await uploader.upload()
+
+    assert bytes(device.image) == data
+    assert device.max_unacked == 4
+    assert uploader.done
+    assert result.offset == result.total == len(data)
+    assert result.percent == 100.0
+    assert result.eta == 0.0
+    assert [p.offset for p in progress] == sorted(p.offset for p in progress)
+
+
+async def test_upload_resumes_after_disconnect(firmware_image):
+    """Test a new upload resumes from the last confirmed offset."""
+    path, data = firmware_image
+    device = SimulatedFirmwareDevice(window=4, disconnect_after=50)
+    uploader = FirmwareUploader(path, device.write, chunk_size=15, window=4)
+    device.uploader = uploader
+
+    with pytest.raises(FirmwareUploadError):
+        await uploader.upload()
+    resume_offset = uploader.confirmed_offset
+    assert 0 < resume_offset < len(data)
+
+    device.reconnect()
+    sent_before = len(device.offsets)
+    await uploader.upload()
+
+    assert device.offsets[sent_before] == resume_offset
+    assert bytes(device.image) == data
+
+
+async def test_upload_shrinks_window_when_rejected(firmware_image):
+    """Test the window adapts to a device that accepts fewer packets."""
+    path, data = firmware_image
+    device = SimulatedFirmwareDevice(window=2)
+    uploader = FirmwareUploader(path, device.write, chunk_size=15, window=8)
+    device.uploader = uploader
+
+    await uploader.upload()
+
+    assert bytes(device.image) == data
+    assert device.max_unacked == 2
+
+
+async def test_upload_regrows_window_after_transient_rejection(firmware_image):
+    """Test one rejected window does not slow down the rest of the upload."""
+    path, data = firmware_image
+    device = SimulatedFirmwareDevice(window=8, reject_windows=1)
+    uploader = FirmwareUploader(path, device.write, chunk_size=15, window=8)
+    device.uploader = uploader
+
+    await uploader.upload()
+
+    assert bytes(device.image) == data
+    assert uploader._window == 8
+    assert device.max_unacked == 8
+
+
+async def test_upload_fails_when_offset_keeps_being_rejected(firmware_image):
+    """Test a device rejecting the same offset over and over fails the upload."""
+    path, _ = firmware_image
+    device = SimulatedFirmwareDevice(window=8, reject_windows=1_000_000)
+    uploader = FirmwareUploader(
+        path, device.write, chunk_size=15, window=8, max_rejections=5
+    )
+    device.uploader = uploader
+
+    with pytest.raises(FirmwareUploadError):
+        await uploader.upload()
+
+    assert uploader.confirmed_offset == 0
+    assert len(device.offsets) < 100
+
+
+async def test_upload_ignores_rejection_of_earlier_window(firmware_image):
+    """Test a late rejection of a resent window does not rewind the next one."""
+    path, data = firmware_image
+    device = SimulatedFirmwareDevice(window=4)
+    uploader = FirmwareUploader(path, device.write, chunk_size=15, window=4)
+    device.uploader = uploader
+    write = device.write
+    windows = 0
+
+    async def _write(packet: bytes) -> None:
+        """Deliver a rejection tagged with the previous window."""
+        nonlocal windows
+        ack_request, tag, _, _ = parse_firmware_packet(packet)
+        await write(packet)
+        if ack_request:
+            windows += 1
+            if windows == 2:
+                uploader.handle_status(
+                    0, build_firmware_status(FW_STATUS_REJECTED, tag - 1, 0)
+                )
+
+    uploader._write = _write
+
+    await uploader.upload()
+
+    assert bytes(device.image) == data
+    assert device.offsets == sorted(device.offsets)
+    assert device.max_unacked == 4
+
+
+async def test_upload_times_out_without_acknowledgement(firmware_image):
+    """Test an unresponsive device fails the upload."""
+    path, _ = firmware_image
+
+    async def _write(packet: bytes) -> None:
+        """Swallow the packet."""
+
+    uploader = FirmwareUploader(path, _write, chunk_size=15, ack_timeout=0.01)
+
+    with pytest.raises(FirmwareUploadError):
+        await uploader.upload()
+    assert uploader.confirmed_offset == 0
@@ -0,0 +1,38 @@
+"""Test the cross-device update hub."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from custom_components.iqos.hub import IQOSUpdateHub
+
+
+async def test_flush_batches_and_keeps_order(hass):
+    """Test dirty coordinators are flushed together in order."""
+    hub = IQOSUpdateHub(hass, window=0, max_devices=2)
+    flushed = []
+    coordinators = [MagicMock() for _ in range(3)]
+    for index, coordinator in enumerate(coordinators):
+        coordinator.async_flush.side_effect = lambda index=index: flushed.append(index)
+
+    for coordinator in (*coordinators, coordinators[0], coordinators[1]):
+        hub.async_mark_dirty(coordinator)
+    assert flushed == []
+
+    await asyncio.sleep(0)
+    assert flushed == [0, 1]
+
+    await asyncio.sleep(0)
+    assert flushed == [0, 1, 2]
+    assert hub.flushes == 2
+
+
+async def test_discard_cancels_flush(hass):
+    """Test discarding the last dirty coordinator cancels the flush."""
+    hub = IQOSUpdateHub(hass, window=10)
+    coordinator = MagicMock()
+
+    hub.async_mark_dirty(coordinator)
+    hub.async_discard(coordinator)
+
+    assert hub._flush_handle is None
+    coordinator.async_flush.assert_not_called()
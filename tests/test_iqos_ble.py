@@ -0,0 +1,350 @@
+"""Test the IQOSBLE connection handling against a simulated holder."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from bleak.exc import BleakError
+import pytest
+
+from custom_components.iqos.api import CharacteristicMissingError, IQOSBLE
+from custom_components.iqos.api.const import (
+    ATT_HEADER_SIZE,
+    CHARACTERISTIC_FW_UPGRADE_CONTROL,
+    CHARACTERISTIC_FW_UPGRADE_STATUS,
+    CHARACTERISTIC_NOTIFY,
+    FW_PACKET_HEADER_SIZE,
+    FW_STATUS_OK,
+)
+from custom_components.iqos.api.firmware import (
+    build_firmware_status,
+    parse_firmware_packet,
+)
+from custom_components.iqos.api.rssi import RssiTracker
+
+ALL_CHARACTERISTICS = (
+    CHARACTERISTIC_NOTIFY,
+    CHARACTERISTIC_FW_UPGRADE_CONTROL,
+    CHARACTERISTIC_FW_UPGRADE_STATUS,
+)
+
+
+class SimulatedClient:
+    """Connected client of a simulated holder."""
+
+    def __init__(self, holder, disconnected_callback, mtu_size: int) -> None:
+        """Initialize the client."""
+        self._holder = holder
+        self._disconnected_callback = disconnected_callback
+        self._handlers = {}
+        self.is_connected = True
+        self.mtu_size = mtu_size
+        self.services = MagicMock()
+        self.services.get_characteristic.side_effect = (
+            lambda uuid: uuid in holder.characteristics
+        )
+        self.payload_sizes: list[int] = []
+
+    async def start_notify(self, uuid, handler) -> None:
+        """Subscribe to a characteristic."""
+        self._handlers[uuid] = handler
+
+    async def stop_notify(self, uuid) -> None:
+        """Unsubscribe from a characteristic."""
+        self._handlers.pop(uuid, None)
+
+    async def disconnect(self) -> None:
+        """Disconnect on request."""
+        if self._holder.disconnect_gate is not None:
+            await self._holder.disconnect_gate.wait()
+        self.drop()
+
+    def drop(self) -> None:
+        """Lose the link."""
+        if self.is_connected:
+            self.is_connected = False
+            self._disconnected_callback(self)
+
+    async def write_gatt_char(self, uuid, data, response=True) -> None:
+        """Write the firmware upgrade control characteristic."""
+        if not self.is_connected:
+            raise BleakError("Not connected")
+        assert uuid == CHARACTERISTIC_FW_UPGRADE_CONTROL
+        assert not response
+        ack_request, tag, offset, payload = parse_firmware_packet(data)
+        self.payload_sizes.append(len(payload))
+        self._holder.receive(offset, payload)
+        if self._holder.drop_after == self._holder.packets:
+            self.drop()
+        elif ack_request:
+            status = build_firmware_status(FW_STATUS_OK, tag, self._holder.confirm())
+            asyncio.get_running_loop().call_soon(
+                self._handlers[CHARACTERISTIC_FW_UPGRADE_STATUS], 0, status
+            )
+
+
+class SimulatedHolder:
+    """Holder that accepts firmware packets and drops the link once."""
+
+    def __init__(
+        self,
+        mtus: tuple[int, ...] = (23,),
+        characteristics: tuple[str, ...] = ALL_CHARACTERISTICS,
+        drop_after: int | None = None,
+        fail_connects: tuple[int, ...] = (),
+    ) -> None:
+        """Initialize the holder."""
+        self.mtus = mtus
+        self.characteristics = characteristics
+        self.drop_after = drop_after
+        self.fail_connects = fail_connects
+        self.attempts = 0
+        self.disconnect_gate: asyncio.Event | None = None
+        self.clients: list[SimulatedClient] = []
+        self.image = bytearray()
+        self.confirmed = 0
+        self.packets = 0
+
+    async def establish_connection(
+        self, client_class, device, name, disconnected_callback, **kwargs
+    ) -> SimulatedClient:
+        """Connect, negotiating the next MTU."""
+        self.attempts += 1
+        if self.attempts in self.fail_connects:
+            raise BleakError("Device not found")
+        del self.image[self.confirmed :]
+        mtu_size = self.mtus[min(len(self.clients), len(self.mtus) - 1)]
+        client = SimulatedClient(self, disconnected_callback, mtu_size)
+        self.clients.append(client)
+        return client
+
+    def receive(self, offset: int, payload: bytes) -> None:
+        """Store a packet that continues the image."""
+        self.packets += 1
+        if offset == len(self.image):
+            self.image += payload
+
+    def confirm(self) -> int:
+        """Acknowledge everything received so far."""
+        self.confirmed = len(self.image)
+        return self.confirmed
+
+
+@pytest.fixture
+def firmware_image(tmp_path):
+    """Write a firmware image to disk."""
+    data = bytes(i * 7 % 251 for i in range(10_000))
+    path = tmp_path / "firmware.bin"
+    path.write_bytes(data)
+    return path, data
+
+
+async def _settle() -> None:
+    """Let reconnect and migration tasks run."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def _iqos_ble() -> IQOSBLE:
+    device = MagicMock(address="AA:BB:CC:DD:EE:FF")
+    device.name = "IQOS ILUMA"
+    return IQOSBLE(device)
+
+
+async def test_upload_firmware_resizes_packets_on_reconnect(firmware_image):
+    """Test an interrupted upload resumes with packets sized for the new MTU."""
+    path, data = firmware_image
+    holder = SimulatedHolder(mtus=(100, 23), drop_after=20)
+    iqos_ble = _iqos_ble()
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ):
+        result = await iqos_ble.upload_firmware(path)
+
+    assert bytes(holder.image) == data
+    assert result.offset == result.total == len(data)
+    first, *resumed = holder.clients
+    assert max(first.payload_sizes) == 100 - ATT_HEADER_SIZE - FW_PACKET_HEADER_SIZE
+    assert resumed
+    assert all(
+        size <= 23 - ATT_HEADER_SIZE - FW_PACKET_HEADER_SIZE
+        for client in resumed
+        for size in client.payload_sizes
+    )
+
+
+async def test_upload_firmware_resubscribes_in_lazy_mode(firmware_image):
+    """Test a link reopened by an upload in lazy mode is fully initialised."""
+    path, data = firmware_image
+    holder = SimulatedHolder(drop_after=20)
+    iqos_ble = _iqos_ble()
+    iqos_ble.set_connection_options(lazy_connect=True)
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ):
+        await iqos_ble.upload_firmware(path)
+
+    assert bytes(holder.image) == data
+    assert len(holder.clients) == 2
+    assert CHARACTERISTIC_NOTIFY in holder.clients[-1]._handlers
+    assert not iqos_ble.reconnect_pending
+
+
+async def test_upload_firmware_requires_characteristics(firmware_image):
+    """Test a holder without the firmware upgrade service is refused."""
+    path, _ = firmware_image
+    holder = SimulatedHolder(characteristics=(CHARACTERISTIC_NOTIFY,))
+    iqos_ble = _iqos_ble()
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ), pytest.raises(CharacteristicMissingError):
+        await iqos_ble.upload_firmware(path)
+
+    assert holder.packets == 0
+
+
+async def test_migration_reconnects_for_a_stronger_scanner():
+    """Test a clearly stronger scanner triggers a reconnect."""
+    holder = SimulatedHolder()
+    iqos_ble = _iqos_ble()
+    iqos_ble._rssi_tracker = RssiTracker(smoothing=1, min_samples=1, min_interval=0)
+    adapter, proxy = MagicMock(rssi=-85), MagicMock(rssi=-60)
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ):
+        iqos_ble.set_scanner_advertisements({"hci0": adapter})
+        await iqos_ble.initialise()
+        assert iqos_ble.connect_source == "hci0"
+
+        iqos_ble.set_scanner_advertisements({"hci0": adapter, "proxy": proxy})
+        await _settle()
+
+    assert iqos_ble.migrations == 1
+    assert iqos_ble.connect_source == "proxy"
+    assert len(holder.clients) == 2
+    assert iqos_ble.is_connected
+    # The same advertisement is only counted once per scanner.
+    assert iqos_ble._rssi_tracker.sources["hci0"].samples == 1
+
+
+async def test_failed_migration_still_reconnects_after_link_loss():
+    """Test a link lost after a failed migration is treated as unexpected."""
+    holder = SimulatedHolder(fail_connects=(2,))
+    iqos_ble = _iqos_ble()
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ):
+        await iqos_ble.initialise()
+        await iqos_ble._migrate("proxy")
+        await _settle()
+        assert iqos_ble.is_connected
+        assert len(holder.clients) == 2
+
+        holder.clients[-1].drop()
+        await _settle()
+
+    assert iqos_ble.is_connected
+    assert len(holder.clients) == 3
+
+
+async def test_stop_during_migration_stays_disconnected():
+    """Test stopping while a migration disconnects leaves the holder alone."""
+    holder = SimulatedHolder()
+    iqos_ble = _iqos_ble()
+    iqos_ble._rssi_tracker = RssiTracker(smoothing=1, min_samples=1, min_interval=0)
+    adapter, proxy = MagicMock(rssi=-85), MagicMock(rssi=-60)
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ):
+        iqos_ble.set_scanner_advertisements({"hci0": adapter})
+        await iqos_ble.initialise()
+        first = holder.clients[0]
+        holder.disconnect_gate = asyncio.Event()
+        iqos_ble.set_scanner_advertisements({"hci0": adapter, "proxy": proxy})
+        await _settle()
+
+        stop = asyncio.create_task(iqos_ble.stop())
+        await _settle()
+        holder.disconnect_gate.set()
+        await stop
+        await _settle()
+
+        assert not first.is_connected
+        assert not iqos_ble.is_connected
+        assert len(holder.clients) == 1
+        assert iqos_ble.migrations == 0
+
+        # Advertisements after the stop do not bring the link back.
+        iqos_ble.set_connection_options(lazy_connect=True)
+        iqos_ble._reconnect_pending = True
+        iqos_ble.set_ble_device_and_advertisement_data(
+            iqos_ble._ble_device, MagicMock(rssi=-50)
+        )
+        await _settle()
+
+    assert len(holder.clients) == 1
+
+
+async def test_lazy_mode_waits_for_an_advertisement():
+    """Test a lost link in lazy mode reconnects on the next advertisement."""
+    holder = SimulatedHolder()
+    iqos_ble = _iqos_ble()
+    iqos_ble.set_connection_options(lazy_connect=True)
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ):
+        await iqos_ble.initialise()
+        holder.clients[-1].drop()
+        await _settle()
+        assert iqos_ble.reconnect_pending
+        assert len(holder.clients) == 1
+
+        iqos_ble.set_ble_device_and_advertisement_data(
+            iqos_ble._ble_device, MagicMock(rssi=-60)
+        )
+        await _settle()
+
+    assert iqos_ble.is_connected
+    assert not iqos_ble.reconnect_pending
+    assert len(holder.clients) == 2
+    assert CHARACTERISTIC_NOTIFY in holder.clients[-1]._handlers
+
+
+async def test_exhausted_retries_wait_for_an_advertisement():
+    """Test running out of reconnect attempts waits for the next advertisement."""
+    holder = SimulatedHolder(fail_connects=(2, 3, 4))
+    iqos_ble = _iqos_ble()
+    iqos_ble.set_connection_options(max_attempts=3)
+
+    with patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        holder.establish_connection,
+    ), patch("custom_components.iqos.api.iqos_ble.BLEAK_BACKOFF_TIME", 0):
+        await iqos_ble.initialise()
+        holder.clients[-1].drop()
+        await _settle()
+        assert holder.attempts == 4
+        assert iqos_ble.reconnect_pending
+        assert not iqos_ble.is_connected
+
+        iqos_ble.set_ble_device_and_advertisement_data(
+            iqos_ble._ble_device, MagicMock(rssi=-60)
+        )
+        await _settle()
+
+    assert iqos_ble.is_connected
+    assert not iqos_ble.reconnect_pending
+    assert holder.attempts == 5
@@ -0,0 +1,48 @@
+"""Test the per-source RSSI tracking and migration policy."""
+
+from custom_components.iqos.api.rssi import RssiTracker
+
+
+def test_moving_average_and_best_source():
+    """Test samples are smoothed and the strongest fresh source wins."""
+    tracker = RssiTracker(smoothing=0.5, stale_after=60)
+
+    assert tracker.update("proxy", -80, now=0) == -80
+    assert tracker.update("proxy", -60, now=1) == -70
+    tracker.update("adapter", -75, now=1)
+    assert tracker.best_source(now=2) == "proxy"
+
+    tracker.update("adapter", -75, now=100)
+    assert tracker.average("proxy", now=100) is None
+    assert tracker.best_source(now=100) == "adapter"
+
+
+def test_migration_needs_hysteresis_samples_and_hold_off():
+    """Test the link only moves to a clearly and steadily better source."""
+    tracker = RssiTracker(
+        smoothing=1, hysteresis=8, min_samples=3, min_interval=300, stale_after=600
+    )
+    tracker.update("adapter", -85, now=0)
+    tracker.connected(now=0)
+
+    for now in (10, 20, 30):
+        tracker.update("proxy", -70, now=now)
+    assert tracker.migration_target("adapter", now=30) is None
+
+    tracker.update("adapter", -85, now=300)
+    assert tracker.migration_target("adapter", now=300) == "proxy"
+
+    tracker.update("adapter", -75, now=310)
+    assert tracker.migration_target("adapter", now=310) is None
+
+
+def test_no_migration_without_current_signal():
+    """Test a silent connected source is not compared against."""
+    tracker = RssiTracker(stale_after=60, min_interval=0, min_samples=1)
+    tracker.update("adapter", -90, now=0)
+    tracker.connected(now=0)
+
+    tracker.update("proxy", -50, now=100)
+
+    assert tracker.migration_target("adapter", now=100) is None
+    assert tracker.migration_target(None, now=100) is None
@@ -0,0 +1,280 @@
+"""Scale test with hundreds of simulated holders in one instance.
+
+The test only runs when ``IQOS_SCALE_DEVICES`` sets the number of holders, at
+least two, e.g. ``IQOS_SCALE_DEVICES=200 pytest tests/test_scale.py``. The
+report is written to ``scale_report.json`` or the path in
+``IQOS_SCALE_REPORT``.
+"""
+
+import asyncio
+from contextlib import suppress
+from datetime import timedelta
+import json
+import math
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.iqos.const import (
+    DATA_UPDATE_HUB,
+    DOMAIN,
+    UPDATE_HUB_MAX_DEVICES,
+)
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_ADDRESS, EVENT_STATE_CHANGED
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+DEVICES = int(os.environ.get("IQOS_SCALE_DEVICES", "0"))
+REPORT_PATH = os.environ.get("IQOS_SCALE_REPORT", "scale_report.json")
+ROUNDS = 10
+DISCONNECT_RATIO = 0.1
+LAG_INTERVAL = 0.005
+
+# Budgets per holder, about three times what a run takes on a laptop. The
+# first holder also pays for loading the integration and its platforms, so
+# it has its own budget and is left out of the per holder numbers. Setup is
+# timed while memory is traced, which slows it down.
+MAX_FIRST_SETUP_SECONDS = 1.0
+MAX_SETUP_SECONDS_PER_DEVICE = 0.1
+MAX_UNLOAD_SECONDS_PER_DEVICE = 0.01
+MAX_MEMORY_BYTES_PER_DEVICE = 128 * 1024
+
+pytestmark = pytest.mark.skipif(
+    DEVICES < 2, reason="Set IQOS_SCALE_DEVICES to run the scale test"
+)
+
+
+class SimulatedClient:
+    """Connected client of a simulated holder."""
+
+    def __init__(self, disconnected_callback) -> None:
+        """Initialize the client."""
+        self._disconnected_callback = disconnected_callback
+        self._handlers = {}
+        self.is_connected = True
+        self.mtu_size = 23
+
+    async def start_notify(self, uuid, handler) -> None:
+        """Subscribe to a characteristic."""
+        self._handlers[uuid] = handler
+
+    async def stop_notify(self, uuid) -> None:
+        """Unsubscribe from a characteristic."""
+        self._handlers.pop(uuid, None)
+
+    async def disconnect(self) -> None:
+        """Disconnect on request."""
+        self.drop()
+
+    def drop(self) -> None:
+        """Lose the link."""
+        if self.is_connected:
+            self.is_connected = False
+            self._disconnected_callback(self)
+
+    def notify(self, data: bytes) -> None:
+        """Send a notification to every subscriber."""
+        for handler in list(self._handlers.values()):
+            handler(0, bytearray(data))
+
+
+class SimulatedFleet:
+    """Simulated holders keyed by address."""
+
+    def __init__(self) -> None:
+        """Initialize the fleet."""
+        self.clients: dict[str, SimulatedClient] = {}
+        self.connects = 0
+
+    def ble_device(self, address: str) -> MagicMock:
+        """Return the BLE device of a holder."""
+        device = MagicMock(address=address)
+        device.name = "IQOS ILUMA"
+        return device
+
+    async def establish_connection(
+        self, client_class, device, name, disconnected_callback, **kwargs
+    ) -> SimulatedClient:
+        """Connect to a holder."""
+        self.connects += 1
+        client = SimulatedClient(disconnected_callback)
+        self.clients[device.address] = client
+        return client
+
+
+def _address(index: int) -> str:
+    return "AA:BB:" + ":".join(f"{b:02X}" for b in index.to_bytes(4, "big"))
+
+
+def _frame(case_battery: int, pen_battery: int) -> bytes:
+    return bytes((0x07, 0x00, case_battery, 0x00, 0x00, 0x00, pen_battery))
+
+
+async def _monitor_lag(samples: list[float]) -> None:
+    """Record how late the loop wakes up a sleeping task."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(time.perf_counter() - start - LAG_INTERVAL)
+
+
+async def _settle(hass) -> None:
+    """Let reconnect tasks, debounced updates and hub flushes finish."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+    for _ in range(2):
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=5))
+        await hass.async_block_till_done()
+
+
+@pytest.fixture
+def fleet():
+    """Replace the bluetooth stack with a simulated fleet.
+
+    The integration is measured on its own, without the scanners and timers
+    of the bluetooth integration.
+    """
+    fleet = SimulatedFleet()
+    with patch(
+        "custom_components.iqos.close_stale_connections_by_address", AsyncMock()
+    ), patch(
+        "homeassistant.components.bluetooth.async_ble_device_from_address",
+        side_effect=lambda hass, address, connectable: fleet.ble_device(address),
+    ), patch(
+        "homeassistant.components.bluetooth.async_scanner_devices_by_address",
+        return_value=[],
+    ), patch(
+        "homeassistant.components.bluetooth.async_register_callback",
+        return_value=Mock(),
+    ), patch(
+        "custom_components.iqos.api.iqos_ble.establish_connection",
+        fleet.establish_connection,
+    ):
+        yield fleet
+
+
+async def test_scale(hass, fleet):
+    """Set up, drive and unload a fleet of holders and report the cost."""
+    rng = random.Random(0)
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            title=f"IQOS {index}",
+            unique_id=_address(index),
+            data={CONF_ADDRESS: _address(index)},
+        )
+        for index in range(DEVICES)
+    ]
+    first, *rest = entries
+
+    # The first holder pays for importing and loading the integration and its
+    # platforms, the others are measured against the state it leaves behind.
+    first.add_to_hass(hass)
+    start = time.perf_counter()
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    first_setup_seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    memory_before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    for entry in rest:
+        entry.add_to_hass(hass)
+    await asyncio.gather(
+        *(hass.config_entries.async_setup(entry.entry_id) for entry in rest)
+    )
+    await hass.async_block_till_done()
+    setup_seconds = time.perf_counter() - start
+    memory_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memory = sum(
+        stat.size_diff for stat in memory_after.compare_to(memory_before, "filename")
+    )
+    assert all(entry.state is ConfigEntryState.LOADED for entry in entries)
+
+    state_writes = 0
+
+    def _count_write(event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+    lag: list[float] = []
+    monitor = asyncio.create_task(_monitor_lag(lag))
+    notifications = disconnects = 0
+    flushes = hass.data[DATA_UPDATE_HUB].flushes
+    start = time.perf_counter()
+    for round_ in range(ROUNDS):
+        for index in range(DEVICES):
+            fleet.clients[_address(index)].notify(
+                _frame(100 - round_, rng.choice((0, 1)))
+            )
+            notifications += 1
+        for index in rng.sample(range(DEVICES), int(DEVICES * DISCONNECT_RATIO)):
+            fleet.clients[_address(index)].drop()
+            disconnects += 1
+        await _settle(hass)
+    for client in fleet.clients.values():
+        client.notify(_frame(50, 1))
+        notifications += 1
+    await _settle(hass)
+    drive_seconds = time.perf_counter() - start
+    flushes = hass.data[DATA_UPDATE_HUB].flushes - flushes
+    monitor.cancel()
+    with suppress(asyncio.CancelledError):
+        await monitor
+    unsub()
+
+    assert all(client.is_connected for client in fleet.clients.values())
+    assert all(state.state == "50" for state in hass.states.async_all("sensor"))
+    entities = len(hass.states.async_entity_ids(("sensor", "binary_sensor")))
+
+    start = time.perf_counter()
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    unload_seconds = time.perf_counter() - start
+
+    lag.sort()
+    report = {
+        "devices": DEVICES,
+        "rounds": ROUNDS,
+        "notifications": notifications,
+        "disconnects": disconnects,
+        "connects": fleet.connects,
+        "first_setup_seconds": first_setup_seconds,
+        "setup_seconds_per_device": setup_seconds / len(rest),
+        "unload_seconds": unload_seconds,
+        "memory_per_device_bytes": memory / len(rest),
+        "state_writes": state_writes,
+        "state_writes_per_second": state_writes / drive_seconds,
+        "update_hub_flushes": flushes,
+        "loop_lag_mean_seconds": statistics.fmean(lag) if lag else 0.0,
+        "loop_lag_p95_seconds": lag[int(len(lag) * 0.95)] if lag else 0.0,
+        "loop_lag_max_seconds": lag[-1] if lag else 0.0,
+    }
+    with open(REPORT_PATH, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+
+    assert first_setup_seconds <= MAX_FIRST_SETUP_SECONDS
+    assert report["setup_seconds_per_device"] <= MAX_SETUP_SECONDS_PER_DEVICE
+    assert unload_seconds <= MAX_UNLOAD_SECONDS_PER_DEVICE * DEVICES
+    assert report["memory_per_device_bytes"] <= MAX_MEMORY_BYTES_PER_DEVICE
+    # Loop lag is only reported. Jumping the clock fires the debounce timers
+    # of every holder in the same loop iteration, which real holders do not,
+    # so the lag the harness sees grows with the fleet.
+    # Every notification and link change writes each entity of its holder
+    # at most once, debouncing and batching may only lower that.
+    assert state_writes <= (notifications + 2 * disconnects) * entities / DEVICES
+    # Each settle flushes at most twice, one batch per UPDATE_HUB_MAX_DEVICES.
+    assert flushes <= (ROUNDS + 1) * 2 * math.ceil(DEVICES / UPDATE_HUB_MAX_DEVICES)
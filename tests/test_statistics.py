@@ -0,0 +1,92 @@
+"""Test the hourly long-term statistics."""
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.iqos.api import IQOSBLEState
+from custom_components.iqos.statistics import IQOSStatistics, IQOSStatisticsHub
+from homeassistant.components.recorder.models import StatisticMeanType
+
+
+def _statistics(hass, hub, address: str) -> IQOSStatistics:
+    iqos_ble = MagicMock(address=address, is_open=False)
+    return IQOSStatistics(hass, iqos_ble, "IQOS", hub)
+
+
+async def test_hourly_aggregates(hass, freezer):
+    """Test an hour of updates is pushed as one set of statistics."""
+    freezer.move_to(datetime(2026, 1, 1, 10, tzinfo=timezone.utc))
+    hub = IQOSStatisticsHub(hass)
+    statistics = _statistics(hass, hub, "AA:BB:CC:DD:EE:FF")
+    unsub = statistics.async_start()
+
+    statistics._async_handle_update(IQOSBLEState(case_battery=80))
+    freezer.move_to(datetime(2026, 1, 1, 10, 30, tzinfo=timezone.utc))
+    statistics._async_handle_update(IQOSBLEState(case_battery=60, is_open=True))
+    freezer.move_to(datetime(2026, 1, 1, 10, 45, tzinfo=timezone.utc))
+    statistics._async_handle_update(IQOSBLEState(case_battery=60))
+
+    end = datetime(2026, 1, 1, 11, tzinfo=timezone.utc)
+    freezer.move_to(end)
+    with patch(
+        "custom_components.iqos.statistics.async_add_external_statistics"
+    ) as add_statistics, patch.object(
+        hub,
+        "_async_last_usage_sums",
+        AsyncMock(return_value={"iqos:aa_bb_cc_dd_ee_ff_usage": 5.0}),
+    ):
+        hub._async_handle_period_end(end)
+        await hass.async_block_till_done()
+    unsub()
+
+    (_, battery_metadata, battery), (_, usage_metadata, usage) = (
+        call.args for call in add_statistics.call_args_list
+    )
+    assert battery_metadata["statistic_id"] == "iqos:aa_bb_cc_dd_ee_ff_case_battery"
+    assert battery_metadata["mean_type"] is StatisticMeanType.ARITHMETIC
+    assert "has_mean" not in battery_metadata
+    assert battery == [
+        {
+            "start": datetime(2026, 1, 1, 10, tzinfo=timezone.utc),
+            "min": 60,
+            "max": 80,
+            "mean": 70.0,
+        }
+    ]
+    assert usage_metadata["statistic_id"] == "iqos:aa_bb_cc_dd_ee_ff_usage"
+    assert usage_metadata["mean_type"] is StatisticMeanType.NONE
+    assert usage[0]["state"] == 1
+    assert usage[0]["sum"] == 6.0
+
+
+async def test_hub_pushes_all_holders_together(hass, freezer):
+    """Test one timer closes every holder and loads missing sums at once."""
+    freezer.move_to(datetime(2026, 1, 1, 10, tzinfo=timezone.utc))
+    hub = IQOSStatisticsHub(hass)
+    holders = [
+        _statistics(hass, hub, f"AA:BB:CC:DD:EE:{index:02X}") for index in range(3)
+    ]
+    unsubs = [statistics.async_start() for statistics in holders]
+    assert hub._unsub_time is not None
+
+    end = datetime(2026, 1, 1, 11, tzinfo=timezone.utc)
+    freezer.move_to(end)
+    last_usage_sums = AsyncMock(
+        side_effect=lambda statistic_ids: dict.fromkeys(statistic_ids, 2.0)
+    )
+    with patch(
+        "custom_components.iqos.statistics.async_add_external_statistics"
+    ) as add_statistics, patch.object(hub, "_async_last_usage_sums", last_usage_sums):
+        hub._async_handle_period_end(end)
+        await hass.async_block_till_done()
+
+    last_usage_sums.assert_awaited_once()
+    assert len(last_usage_sums.call_args.args[0]) == 3
+    assert [call.args[2][0]["sum"] for call in add_statistics.call_args_list] == [
+        2.0
+    ] * 3
+    assert all(statistics.usage_sum == 2.0 for statistics in holders)
+
+    for unsub in unsubs:
+        unsub()
+    assert hub._unsub_time is None